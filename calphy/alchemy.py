@@ -53,6 +53,7 @@ class Alchemy(cph.Phase):
         log_to_screen=log_to_screen)
 
 
+    @cph.close_lammps_on_error
     def run_averaging(self):
         """
         Run averaging routine
@@ -74,8 +75,7 @@ class Alchemy(cph.Phase):
         Fix lattice option is not implemented at present.
         At the end of the run, the averaged box dimensions are calculated. 
         """
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         lmp.command(f'pair_style {self.calc._pair_style_with_options[0]}')
 
@@ -87,11 +87,7 @@ class Alchemy(cph.Phase):
         lmp = ph.set_mass(lmp, self.calc)
 
         #add some computes
-        lmp.command("variable         mvol equal vol")
-        lmp.command("variable         mlx equal lx")
-        lmp.command("variable         mly equal ly")
-        lmp.command("variable         mlz equal lz")
-        lmp.command("variable         mpress equal press")
+        self.define_averaging_variables(lmp)
 
         #add some computes
         if not self.calc._fix_lattice:
@@ -113,13 +109,12 @@ class Alchemy(cph.Phase):
         self.dump_current_snapshot(lmp, "traj.equilibration_stage2.dat")
         self.check_if_melted(lmp, "traj.equilibration_stage2.dat")
 
-        #close object and process traj
         lmp = ph.write_data(lmp, "conf.equilibration.data")
-        lmp.close()
 
 
     
 
+    @cph.close_lammps_on_error
     def run_integration(self, iteration=1):
         """
         Run integration routine
@@ -140,8 +135,7 @@ class Alchemy(cph.Phase):
         """
 
         #create lammps object
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
         
         # Adiabatic switching parameters.
         lmp.command("variable        li       equal   1.0")
@@ -164,28 +158,22 @@ class Alchemy(cph.Phase):
         #remap the box to get the correct pressure
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
-        lmp.command("velocity          all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, np.random.randint(1, 10000)))
+        #collect the switching commands and send them to LAMMPS at once
+        cmds = []
+        cmds.append("velocity          all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, self.get_seed()))
         # Integrator & thermostat.
         if self.calc.npt:
-            lmp.command("fix             f1 all npt temp %f %f %f %s %f %f %f"%(self.calc._temperature, self.calc._temperature, 
+            cmds.append("fix             f1 all npt temp %f %f %f %s %f %f %f"%(self.calc._temperature, self.calc._temperature, 
                 self.calc.md.thermostat_damping[1], self.iso, self.calc._pressure, self.calc._pressure, self.calc.md.barostat_damping[1]))        
         else:
-            lmp.command("fix             f1 all nvt temp %f %f %f"%(self.calc._temperature, self.calc._temperature, 
+            cmds.append("fix             f1 all nvt temp %f %f %f"%(self.calc._temperature, self.calc._temperature, 
                 self.calc.md.thermostat_damping[1]))
 
-        lmp.command("thermo_style    custom step pe")
-        lmp.command("thermo          1000")
-        lmp.command("run             %d"%self.calc.n_equilibration_steps)
+        cmds.append("thermo_style    custom step pe")
+        cmds.append("thermo          1000")
+        cmds.append("run             %d"%self.calc.n_equilibration_steps)
         #equilibration run is over
         
-        #---------------------------------------------------------------
-        # FWD cycle
-        #---------------------------------------------------------------
-        lmp.command("variable         flambda equal ramp(${li},${lf})")
-        lmp.command("variable         blambda equal ramp(${lf},${li})")
-    
-        #lmp.command("pair_style       hybrid/scaled v_flambda %s v_blambda ufm 7.5"%self.options["md"]["pair_style"])
-                    
         # Compute pair definitions
         if self.calc.pair_style[0] == self.calc.pair_style[1]:
             pc =  self.calc.pair_coeff[0]
@@ -202,98 +190,77 @@ class Alchemy(cph.Phase):
             pcraw = pc.split()
             pc2 = " ".join([*pcraw[:2], *[self.calc._pair_style_names[1],], *pcraw[2:]])
 
-
-        lmp.command("pair_style       hybrid/scaled v_flambda %s v_blambda %s"%(
+        #the hybrid potential and outputs are the same for both directions, only the ramp differs
+        switching_cmds = []
+        switching_cmds.append("pair_style       hybrid/scaled v_flambda %s v_blambda %s"%(
             self.calc._pair_style_with_options[0],
             self.calc._pair_style_with_options[1]
             )
         )
-        lmp.command("pair_coeff       %s"%pc1)
-        lmp.command("pair_coeff       %s"%pc2)
-
+        switching_cmds.append("pair_coeff       %s"%pc1)
+        switching_cmds.append("pair_coeff       %s"%pc2)
 
         #apply pair force commands
         if self.calc._pair_style_names[0] == self.calc._pair_style_names[1]:
-            lmp.command("compute         c1 all pair %s 1"%self.calc._pair_style_names[0])
-            lmp.command("compute         c2 all pair %s 2"%self.calc._pair_style_names[1])
+            switching_cmds.append("compute         c1 all pair %s 1"%self.calc._pair_style_names[0])
+            switching_cmds.append("compute         c2 all pair %s 2"%self.calc._pair_style_names[1])
         else:
-            lmp.command("compute         c1 all pair %s"%self.calc._pair_style_names[0])
-            lmp.command("compute         c2 all pair %s"%self.calc._pair_style_names[1])
-
+            switching_cmds.append("compute         c1 all pair %s"%self.calc._pair_style_names[0])
+            switching_cmds.append("compute         c2 all pair %s"%self.calc._pair_style_names[1])
 
         # Output variables.
-        lmp.command("variable        step equal step")
-        lmp.command("variable        dU1 equal c_c1/atoms")             # Driving-force obtained from NEHI procedure.
-        lmp.command("variable        dU2 equal c_c2/atoms")
+        switching_cmds.append("variable        step equal step")
+        switching_cmds.append("variable        dU1 equal c_c1/atoms")             # Driving-force obtained from NEHI procedure.
+        switching_cmds.append("variable        dU2 equal c_c2/atoms")
 
         # Thermo output.
-        lmp.command("thermo_style    custom step v_dU1 v_dU2")
-        lmp.command("thermo          1000")
+        switching_cmds.append("thermo_style    custom step v_dU1 v_dU2")
+        switching_cmds.append("thermo          1000")
 
+        #---------------------------------------------------------------
+        # FWD cycle
+        #---------------------------------------------------------------
+        cmds.append("variable         flambda equal ramp(${li},${lf})")
+        cmds.append("variable         blambda equal ramp(${lf},${li})")
+        cmds.extend(switching_cmds)
 
         #save the necessary items to a file: first step
-        lmp.command("fix             f2 all print 1 \"${dU1} ${dU2} ${flambda}\" screen no file forward_%d.dat"%iteration)
-        lmp.command("run             %d"%self.calc._n_switching_steps)
+        cmds.append("fix             f2 all print %d \"${dU1} ${dU2} ${flambda}\" screen no file forward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run             %d"%self.calc._n_switching_steps)
 
 
         #now equilibrate at the second potential
-        lmp.command("unfix           f2")
-        lmp.command("uncompute       c1")
-        lmp.command("uncompute       c2")
+        cmds.append("unfix           f2")
+        cmds.append("uncompute       c1")
+        cmds.append("uncompute       c2")
 
 
-        lmp.command("pair_style      %s"%self.calc._pair_style_with_options[1])
-        lmp.command("pair_coeff      %s"%self.calc.pair_coeff[1])
+        cmds.append("pair_style      %s"%self.calc._pair_style_with_options[1])
+        cmds.append("pair_coeff      %s"%self.calc.pair_coeff[1])
 
         # Thermo output.
-        lmp.command("thermo_style    custom step pe")
-        lmp.command("thermo          1000")
+        cmds.append("thermo_style    custom step pe")
+        cmds.append("thermo          1000")
 
         #run eqbrm run
-        lmp.command("run             %d"%self.calc.n_equilibration_steps)
+        cmds.append("run             %d"%self.calc.n_equilibration_steps)
         
         
         #reverse switching
-        lmp.command("variable         flambda equal ramp(${lf},${li})")
-        lmp.command("variable         blambda equal ramp(${li},${lf})")
-        
-        
-        lmp.command("pair_style       hybrid/scaled v_flambda %s v_blambda %s"%(self.calc._pair_style_with_options[0], 
-            self.calc._pair_style_with_options[1]))
-        lmp.command("pair_coeff       %s"%pc1)
-        lmp.command("pair_coeff       %s"%pc2)
-
-
-        #apply pair force commands
-        if self.calc._pair_style_names[0] == self.calc._pair_style_names[1]:
-            lmp.command("compute         c1 all pair %s 1"%self.calc._pair_style_names[0])
-            lmp.command("compute         c2 all pair %s 2"%self.calc._pair_style_names[1])
-        else:
-            lmp.command("compute         c1 all pair %s"%self.calc._pair_style_names[0])
-            lmp.command("compute         c2 all pair %s"%self.calc._pair_style_names[1])
-
-
-        # Output variables.
-        lmp.command("variable        step equal step")
-        lmp.command("variable        dU1 equal c_c1/atoms")             # Driving-force obtained from NEHI procedure.
-        lmp.command("variable        dU2 equal c_c2/atoms")
-
-        # Thermo output.
-        lmp.command("thermo_style    custom step v_dU1 v_dU2")
-        lmp.command("thermo          1000")
-
+        cmds.append("variable         flambda equal ramp(${lf},${li})")
+        cmds.append("variable         blambda equal ramp(${li},${lf})")
+        cmds.extend(switching_cmds)
 
         #save the necessary items to a file: first step
-        lmp.command("fix             f2 all print 1 \"${dU1} ${dU2} ${flambda}\" screen no file backward_%d.dat"%iteration)
-        lmp.command("run             %d"%self.calc._n_switching_steps)
+        cmds.append("fix             f2 all print %d \"${dU1} ${dU2} ${flambda}\" screen no file backward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run             %d"%self.calc._n_switching_steps)
 
 
         #now equilibrate at the second potential
-        lmp.command("unfix           f2")
-        lmp.command("uncompute       c1")
-        lmp.command("uncompute       c2")
-
-        lmp.close()
+        cmds.append("unfix           f2")
+        cmds.append("uncompute       c1")
+        cmds.append("uncompute       c2")
+        lmp.command(cmds)
 
 
 
@@ -314,17 +281,21 @@ class Alchemy(cph.Phase):
         Calculates the final work, energy dissipation; In alchemical mode, there is reference system,
         the calculated free energy is the same as the work.
         """
-        w, q, qerr = find_w(self.simfolder, self.calc,
-            full=True, solid=False)
+        if self.calc.mode == "composition_scaling":
+            w_arr, q_arr, qerr_arr, flambda_arr = find_w(self.simfolder, self.calc,
+                full=True, solid=False, composition_integration=True)
+            #the cumulative integrals end with the total work, no need to integrate again
+            w = w_arr[-1]
+            qerr = qerr_arr[-1]
+        else:
+            w, q, qerr = find_w(self.simfolder, self.calc,
+                full=True, solid=False)
 
         self.w = w
         self.ferr = qerr
         self.fe = self.w
         
         if self.calc.mode == "composition_scaling":
-            w_arr, q_arr, qerr_arr, flambda_arr = find_w(self.simfolder, self.calc,
-                full=True, solid=False, composition_integration=True)
-
             #now we need to process the comp scaling
             return flambda_arr, w_arr, q_arr, qerr_arr
 
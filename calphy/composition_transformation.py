@@ -30,6 +30,19 @@ from mendeleev import element
 from ase.io import read, write
 from ase.atoms import Atoms
 from pyscal3.core import element_dict
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _is_element(symbol):
+    """
+    Check if a string is a chemical symbol; cached since every
+    token of a pair_coeff command is checked.
+    """
+    try:
+        _ = element(symbol)
+        return True
+    except ValueError:
+        return False
 
 class CompositionTransformation:
     """
@@ -304,11 +317,7 @@ class CompositionTransformation:
             self.pyscal_structure.atoms.types[count] = self.atom_type[count]
             
     def iselement(self, symbol):
-        try:
-            _ = element(symbol)
-            return True
-        except:
-            return False
+        return _is_element(symbol)
     
     def update_pair_coeff(self, pair_coeff):
         pcsplit = pair_coeff.strip().split()
@@ -26,6 +26,7 @@ import shutil
 import warnings
 import logging
 import numpy as np
+from collections import deque
 
 from pylammpsmpi import LammpsLibrary
 from lammps import lammps
@@ -34,20 +35,28 @@ from ase.io import read, write
 import pyscal3.core as pc
 from pyscal3.trajectory import Trajectory
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 class LammpsScript:
     def __init__(self):
         self.script = []
 
     def command(self, command_str):
-        self.script.append(command_str)
+        if isinstance(command_str, list):
+            self.script.extend(command_str)
+        else:
+            self.script.append(command_str)
 
     def write(self, infile):
+        #write the whole script at once
         with open(infile, 'w') as fout:
-            for line in self.script:
-                fout.write(f'{line}\n')
+            fout.write("".join([f'{line}\n' for line in self.script]))
 
 def create_object(cores, directory, timestep, cmdargs="", 
-    init_commands=(), script_mode=False):
+    init_commands=(), script_mode=False, lmp=None):
     """
     Create LAMMPS object
 
@@ -62,14 +71,26 @@ def create_object(cores, directory, timestep, cmdargs="",
     timestep: float
         timestep for the simulation
 
+    cmdargs: string or list of strings, optional
+        command line arguments for LAMMPS
+
+    lmp: LammpsLibrary object, optional
+        running LAMMPS object to be reused. It is cleared before the
+        initial commands are sent. Ignored in script mode.
+
     Returns
     -------
     lmp : LammpsLibrary object
     """
     if script_mode:
         lmp = LammpsScript()
+    elif lmp is not None:
+        #reuse the running instance instead of starting a new one
+        lmp.command("clear")
     else:
-        if cmdargs == "":
+        if isinstance(cmdargs, str):
+            cmdargs = cmdargs.split()
+        if len(cmdargs) == 0:
             cmdargs = None
         lmp = LammpsLibrary(
             cores=cores, working_directory=directory, cmdargs=cmdargs
@@ -218,6 +239,42 @@ def write_data(lmp, file):
     lmp.command(f"write_data {file}")
     return lmp
 
+def read_columns(filename, usecols=None, nrows=None):
+    """
+    Read the columns of a data file written by LAMMPS
+
+    Parameters
+    ----------
+    filename : string
+        name of the data file
+
+    usecols : list of ints, optional
+        indices of the columns to be read in increasing order, default all columns
+
+    nrows : int, optional
+        number of rows to read from the end of the file, if None all rows are read
+
+    Returns
+    -------
+    data : ndarray
+        array of shape (ncolumns, nrows)
+
+    Notes
+    -----
+    Lines starting with `#` are ignored. If only the last rows are needed, only those
+    lines are kept and parsed. Otherwise, if pandas is available, its C parser
+    is used, which is considerably faster than `np.loadtxt` for long switching runs.
+    """
+    if nrows is not None:
+        with open(filename, 'r') as fin:
+            lines = deque((line for line in fin if not line.startswith('#')), maxlen=nrows)
+        return np.loadtxt(lines, usecols=usecols, unpack=True, ndmin=2)
+    if pd is None:
+        return np.loadtxt(filename, usecols=usecols, unpack=True, comments="#", ndmin=2)
+    data = pd.read_csv(filename, sep=r"\s+", header=None, comment="#", 
+        usecols=usecols, engine="c", dtype=np.float64)
+    return data.to_numpy().T
+
 def prepare_log(file, screen=False):
     logger = logging.getLogger(__name__)
     handler = logging.FileHandler(file)
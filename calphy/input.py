@@ -26,6 +26,7 @@ from typing import Any, Callable, List, ClassVar, Optional, Union
 from pydantic import BaseModel, Field, ValidationError, model_validator, conlist, PrivateAttr
 from pydantic.functional_validators import AfterValidator, BeforeValidator
 from annotated_types import Len
+from functools import lru_cache
 import mendeleev
 
 import yaml
@@ -79,6 +80,170 @@ def _to_float(val):
         return float(val)
     else:
         return [float(x) for x in val] 
+
+@lru_cache(maxsize=None)
+def _get_element_properties(symbol):
+    """
+    Get atomic number and melting point of an element.
+
+    Creating a mendeleev element queries the database each time, the
+    properties are cached since they are requested for every calculation.
+    Only the needed values are stored, not the mendeleev object itself.
+    """
+    chem = mendeleev.element(symbol)
+    return chem.atomic_number, chem.melting_point
+
+def _read_lammps_data_header(infile):
+    """
+    Read the header of a LAMMPS data file
+
+    Parameters
+    ----------
+    infile : string
+        LAMMPS data file
+
+    Returns
+    -------
+    natoms : int
+        number of atoms
+
+    skiprows : int
+        number of lines before the first line of the Atoms section
+
+    style : string or None
+        atom style given as a comment on the Atoms line, None if not given
+
+    Raises
+    ------
+    ValueError
+        if the number of atoms or the Atoms section is not found
+    """
+    natoms = None
+    style = None
+    atoms_found = False
+    try:
+        with open(infile, 'r') as fin:
+            for count, line in enumerate(fin):
+                words = line.split('#')[0].split()
+                if atoms_found:
+                    if len(words) > 0:
+                        break
+                elif len(words) == 0:
+                    continue
+                elif (natoms is None) and (len(words) == 2) and (words[1] == 'atoms') and words[0].isdigit():
+                    natoms = int(words[0])
+                elif words[0] == 'Atoms':
+                    atoms_found = True
+                    hint = line.split('#')[1].split() if '#' in line else []
+                    if len(hint) > 0:
+                        style = hint[0]
+            else:
+                raise ValueError(f'Not a LAMMPS data file: {infile}, could not find Atoms section')
+    except UnicodeDecodeError as e:
+        raise ValueError(f'Not a LAMMPS data file: {infile}') from e
+
+    if natoms is None:
+        raise ValueError(f'Not a LAMMPS data file: {infile}, could not find number of atoms')
+    return natoms, count, style
+
+def _read_lammps_data_types(infile, header=None):
+    """
+    Read the number of atoms and the atom types from a LAMMPS data file
+
+    Parameters
+    ----------
+    infile : string
+        LAMMPS data file in atomic style
+
+    header : tuple, optional
+        header of the file as returned by `_read_lammps_data_header`.
+        Default None, in which case the header is read from the file
+
+    Returns
+    -------
+    natoms : int
+        number of atoms
+
+    types : ndarray of ints
+        type of each atom
+
+    Notes
+    -----
+    Only the header and the type column of the Atoms section are parsed,
+    which avoids creating the full structure when only the composition is needed.
+    If the Atoms section is marked with a style other than atomic, the type is not
+    in the second column and a ValueError is raised.
+    """
+    if header is None:
+        header = _read_lammps_data_header(infile)
+    natoms, count, style = header
+    if (style is not None) and (style != 'atomic'):
+        raise ValueError(f'Atom style {style} in {infile} is not supported, only atomic')
+    types = np.loadtxt(infile, skiprows=count, max_rows=natoms, 
+        usecols=(1,), dtype=int, ndmin=1)
+    if len(types) != natoms:
+        raise ValueError(f'Expected {natoms} atoms in {infile}, found {len(types)}')
+    return natoms, types
+
+@lru_cache(maxsize=None)
+def _create_structure(lattice, lattice_constant, repetitions, element):
+    """
+    Create a crystal structure, cached on the input parameters
+
+    Parameters
+    ----------
+    lattice : string
+        name of the lattice
+
+    lattice_constant : float
+        lattice constant
+
+    repetitions : tuple of ints
+        number of repetitions along each direction
+
+    element : tuple of strings
+        chemical symbols
+
+    Returns
+    -------
+    structure : ASE Atoms
+        the created structure, which should not be modified in place
+    """
+    structure = _make_crystal(lattice,
+        lattice_constant=lattice_constant,
+        repetitions=list(repetitions),
+        element=list(element))
+    return structure.write.ase()
+
+def _count_species(numbers, species):
+    """
+    Count the occurrences of each species in an array of integers
+
+    Parameters
+    ----------
+    numbers : ndarray of ints
+        atom types or atomic numbers of each atom
+
+    species : list of ints
+        species to be counted
+
+    Returns
+    -------
+    counts : ndarray of ints
+        number of atoms of each species, in the order of `species`
+
+    Raises
+    ------
+    ValueError
+        if some of the numbers are not in `species`
+    """
+    species = np.asarray(species, dtype=int)
+    numbers = np.asarray(numbers, dtype=int)
+    counts = np.bincount(numbers, minlength=np.max(species)+1)
+    if np.sum(counts[np.unique(species)]) != len(numbers):
+        unexpected = np.setdiff1d(numbers, species)
+        raise ValueError(f'Found unexpected types {unexpected.tolist()}, expected only {species.tolist()}')
+    return counts[species]
         
 class CompositionScaling(BaseModel, title='Composition scaling input options'):
     _input_chemical_composition: PrivateAttr(default=None)
@@ -98,6 +263,8 @@ class MD(BaseModel, title='MD specific input options'):
     barostat_damping: Annotated[Union[float, conlist(float, min_length=2, max_length=2)], Field(default=0.1, gt=0)]
     cmdargs: Annotated[str, Field(default="")]
     init_commands: Annotated[List, Field(default=[])]
+    seed: Annotated[Union[int,None], Field(default=None)]
+    n_switching_print_steps: Annotated[int, Field(default=10, gt=0)]
 
 
 class NoseHoover(BaseModel, title='Specific input options for Nose-Hoover thermostat'):
@@ -196,8 +363,10 @@ class Calculation(BaseModel, title='Main input class'):
     n_switching_steps: Annotated[ Union[int, conlist(int, min_length=2, max_length=2)], Field(default = [50000, 50000])]
     _n_switching_steps: int = PrivateAttr(default=50000)
     _n_sweep_steps: int = PrivateAttr(default=50000)
+    _n_switching_print_steps: int = PrivateAttr(default=10)
     n_print_steps: Annotated[int, Field(default = 0)]
     n_iterations: Annotated[int, Field(default = 1)]
+    n_parallel_iterations: Annotated[int, Field(default = 1, gt=0)]
     equilibration_control: Annotated[Union[str,None], Field(default = None)]
     folder_prefix: Annotated[Union[str,None], Field(default = None)]
 
@@ -258,9 +427,8 @@ class Calculation(BaseModel, title='Main input class'):
         #chem = mendeleev.element(self.element[0])
         #self._melting_temperature = chem.melting_point
         try:
-            chem = mendeleev.element(self.element[0])
-            self._melting_temperature = chem.melting_point
-        except:
+            self._melting_temperature = _get_element_properties(self.element[0])[1]
+        except ValueError:
             self._melting_temperature = None
 
         if self.temperature == 0:
@@ -322,6 +490,11 @@ class Calculation(BaseModel, title='Main input class'):
         else:
             self._n_sweep_steps = self.n_switching_steps[1]
             self._n_switching_steps = self.n_switching_steps[0]
+
+        #switching output has to be written at the same points in forward and backward runs,
+        #including the end points, so the interval has to divide all preceding runs
+        self._n_switching_print_steps = int(np.gcd.reduce([self.md.n_switching_print_steps, 
+            self.n_equilibration_steps, self._n_switching_steps, self._n_sweep_steps]))
         
         #here we also prepare lattice dict
         for count, element in enumerate(self.element):
@@ -329,7 +502,7 @@ class Calculation(BaseModel, title='Main input class'):
             self._element_dict[element]['mass'] = self.mass[count]
             self._element_dict[element]['count'] = 0
             self._element_dict[element]['composition'] = 0.0
-            self._element_dict[element]['atomic_number'] = mendeleev.element(element).atomic_number
+            self._element_dict[element]['atomic_number'] = _get_element_properties(element)[0]
 
         #generate temporary filename if needed
         write_structure_file = False
@@ -347,18 +520,13 @@ class Calculation(BaseModel, title='Main input class'):
             if self.repeat == [1,1,1]:
                 self.repeat = [5,5,5]
 
-            structure = _make_crystal(self.lattice.lower(),
-                lattice_constant=self.lattice_constant,
-                repetitions=self.repeat,
-                element=self.element)
-            structure = structure.write.ase()
+            structure = _create_structure(self.lattice.lower(),
+                self.lattice_constant,
+                tuple(self.repeat),
+                tuple(self.element))
             
             #extract composition
-            types, typecounts = np.unique(structure.get_chemical_symbols(), return_counts=True)
-
-            for c, t in enumerate(types):
-                self._element_dict[t]['count'] = typecounts[c]
-                self._element_dict[t]['composition'] = typecounts[c]/np.sum(typecounts)
+            self._update_composition(_count_species(structure.get_atomic_numbers(), self._atomic_numbers()))
 
             self._natoms = len(structure)
             self._original_lattice = self.lattice.lower()
@@ -376,18 +544,13 @@ class Calculation(BaseModel, title='Main input class'):
                 else:
                     raise ValueError('Please provide lattice_constant!')
             #now create lattice
-            structure = _make_crystal(self.lattice.lower(),
-                lattice_constant=self.lattice_constant,
-                repetitions=self.repeat,
-                element=self.element)
-            structure = structure.write.ase()
+            structure = _create_structure(self.lattice.lower(),
+                self.lattice_constant,
+                tuple(self.repeat),
+                tuple(self.element))
             
             #extract composition
-            types, typecounts = np.unique(structure.get_chemical_symbols(), return_counts=True)
-
-            for c, t in enumerate(types):
-                self._element_dict[t]['count'] = typecounts[c]
-                self._element_dict[t]['composition'] = typecounts[c]/np.sum(typecounts)
+            self._update_composition(_count_species(structure.get_atomic_numbers(), self._atomic_numbers()))
 
             #concdict_counts = {str(t): typecounts[c] for c, t in enumerate(types)}
             #concdict_frac = {str(t): typecounts[c]/np.sum(typecounts) for c, t in enumerate(types)}
@@ -404,19 +567,27 @@ class Calculation(BaseModel, title='Main input class'):
             if self.file_format == 'lammps-data':
                 #create atomic numbers for proper reading
                 Z_of_type = dict([(count+1, self._element_dict[element]['atomic_number']) for count, element in enumerate(self.element)])
-                structure = read(self.lattice, format='lammps-data', style='atomic', Z_of_type=Z_of_type)
-                #structure = System(aseobj, format='ase')
+                #files without the header of a data file are rejected before trying any reader
+                header = _read_lammps_data_header(self.lattice)
+                try:
+                    #only the types are needed, so read them directly
+                    natoms, types = _read_lammps_data_types(self.lattice, header=header)
+                    if (np.min(types) < 1) or (np.max(types) > self.n_elements):
+                        raise ValueError(f'Atom types in {self.lattice} do not match the number of elements')
+                    typecounts = _count_species(types, np.arange(1, self.n_elements+1))
+                except ValueError:
+                    structure = read(self.lattice, format='lammps-data', style='atomic', Z_of_type=Z_of_type)
+                    #structure = System(aseobj, format='ase')
+                    natoms = len(structure)
+                    typecounts = _count_species(structure.get_atomic_numbers(), self._atomic_numbers())
             else:
                 raise TypeError('Only lammps-data files are supported!')                
 
             #extract composition
             #this is the types read in from the file
-            types, typecounts = np.unique(structure.get_chemical_symbols(), return_counts=True)
-            for c, t in enumerate(types):
-                self._element_dict[t]['count'] = typecounts[c]
-                self._element_dict[t]['composition'] = typecounts[c]/np.sum(typecounts)
+            self._update_composition(typecounts)
             
-            self._natoms = len(structure)
+            self._natoms = natoms
             self._original_lattice = os.path.basename(self.lattice)
             self.lattice = os.path.abspath(self.lattice)
 
@@ -445,6 +616,20 @@ class Calculation(BaseModel, title='Main input class'):
                 raise ValueError(f"Input and output number of atoms are not conserved! Input {self.dict_to_string(self.input_chemical_composition)}, output {self.dict_to_string(self.output_chemical_composition)}, total atoms in structure {structure.natoms}")
         return self
 
+    def _atomic_numbers(self):
+        """
+        Atomic numbers of the elements, in the order of `element`
+        """
+        return [self._element_dict[element]['atomic_number'] for element in self.element]
+
+    def _update_composition(self, typecounts):
+        """
+        Update the count and composition of each element from the number of atoms of each type
+        """
+        for c, element in enumerate(self.element):
+            self._element_dict[element]['count'] = typecounts[c]
+            self._element_dict[element]['composition'] = typecounts[c]/np.sum(typecounts)
+
     def fix_paths(self, potlist): 
         """
         Fix paths for potential files to complete ones
@@ -582,7 +767,7 @@ def _convert_legacy_inputfile(file, return_calcs=False):
                     calc[key] = data[key]
             for key in ["mode", "pair_style", "pair_coeff", "pair_style_options", "npt", 
                             "repeat", "n_equilibration_steps",
-                            "n_switching_steps", "n_print_steps", "n_iterations", "potential_file", "spring_constants",
+                            "n_switching_steps", "n_print_steps", "n_iterations", "n_parallel_iterations", "potential_file", "spring_constants",
                             "melting_cycle", "equilibration_control", "folder_prefix", "temperature_high"]:
                 if key in ci.keys():
                     calc[key] = ci[key]
@@ -632,7 +817,7 @@ def _convert_legacy_inputfile(file, return_calcs=False):
                         calc[key] = data[key]
                 for key in ["mode", "pair_style", "pair_coeff", "pair_style_options", "npt", 
                                 "repeat", "n_equilibration_steps",
-                                "n_switching_steps", "n_print_steps", "n_iterations", "potential_file", "spring_constants",
+                                "n_switching_steps", "n_print_steps", "n_iterations", "n_parallel_iterations", "potential_file", "spring_constants",
                                 "melting_cycle", "equilibration_control", "folder_prefix", "temperature_high"]:
                     if key in ci.keys():
                         calc[key] = ci[key]
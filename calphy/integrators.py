@@ -32,6 +32,7 @@ from scipy.integrate import cumtrapz
 from tqdm import tqdm
 import pyscal3.core as pc
 from ase.io import read
+from calphy.helpers import read_columns
 
 #Constants
 h = const.physical_constants["Planck constant in eV/Hz"][0]
@@ -75,8 +76,8 @@ def integrate_path(calc,
     """
     natoms = np.array([calc._element_dict[x]['count'] for x in calc.element])
     concentration = np.array([calc._element_dict[x]['composition'] for x in calc.element])
-    fdata = np.loadtxt(fwdfilename, unpack=True, comments="#")
-    bdata = np.loadtxt(bkdfilename, unpack=True, comments="#")
+    fdata = read_columns(fwdfilename)
+    bdata = read_columns(bkdfilename)
 
     if solid:
         fdui = fdata[0]
@@ -225,8 +226,9 @@ def integrate_rs(simfolder, f0, t,
     p = p/(10000*160.21766208)
     
     for i in range(1, nsims+1):
-        fdx, fp, fvol, flambda = np.loadtxt(os.path.join(simfolder, "ts.forward_%d.dat"%i), unpack=True, comments="#")
-        bdx, bp, bvol, blambda = np.loadtxt(os.path.join(simfolder, "ts.backward_%d.dat"%i), unpack=True, comments="#")
+        #the instantaneous pressure is not needed
+        fdx, fvol, flambda = read_columns(os.path.join(simfolder, "ts.forward_%d.dat"%i), usecols=[0, 2, 3])
+        bdx, bvol, blambda = read_columns(os.path.join(simfolder, "ts.backward_%d.dat"%i), usecols=[0, 2, 3])
         
         if scale_energy:
             fdx /= flambda
@@ -284,8 +286,8 @@ def integrate_ps(simfolder, f0, natoms, pi, pf, nsims=1,
     ws = []
 
     for i in range(1, nsims+1):
-        _, fp, fvol, _ = np.loadtxt(os.path.join(simfolder, "ps.forward_%d.dat"%i), unpack=True, comments="#")
-        _, bp, bvol, _ = np.loadtxt(os.path.join(simfolder, "ps.backward_%d.dat"%i), unpack=True, comments="#")
+        fp, fvol = read_columns(os.path.join(simfolder, "ps.forward_%d.dat"%i), usecols=[1, 2])
+        bp, bvol = read_columns(os.path.join(simfolder, "ps.backward_%d.dat"%i), usecols=[1, 2])
         
         fvol = fvol/natoms
         bvol = bvol/natoms
@@ -396,10 +398,11 @@ def integrate_dcc(folder1, folder2, nsims=1, scale_energy=True,
 
     ws = []
     for i in range(nsims):
-        fsu, fsp, fsv, fsl = np.loadtxt(os.path.join(folder1, "ts.forward_%d.dat"%(i+1)), unpack=True)
-        bsu, bsp, bsv, bsl = np.loadtxt(os.path.join(folder1, "ts.backward_%d.dat"%(i+1)), unpack=True)
-        flu, flp, flv, fll = np.loadtxt(os.path.join(folder2, "ts.forward_%d.dat"%(i+1)), unpack=True)
-        blu, blp, blv, bll = np.loadtxt(os.path.join(folder2, "ts.backward_%d.dat"%(i+1)), unpack=True)
+        #the instantaneous pressure is not needed
+        fsu, fsv, fsl = read_columns(os.path.join(folder1, "ts.forward_%d.dat"%(i+1)), usecols=[0, 2, 3])
+        bsu, bsv, bsl = read_columns(os.path.join(folder1, "ts.backward_%d.dat"%(i+1)), usecols=[0, 2, 3])
+        flu, flv, fll = read_columns(os.path.join(folder2, "ts.forward_%d.dat"%(i+1)), usecols=[0, 2, 3])
+        blu, blv, bll = read_columns(os.path.join(folder2, "ts.backward_%d.dat"%(i+1)), usecols=[0, 2, 3])
 
         if scale_energy:
             fsu = fsu/fsl
@@ -407,12 +410,6 @@ def integrate_dcc(folder1, folder2, nsims=1, scale_energy=True,
             flu = flu/fll
             blu = blu/bll
 
-        #now convert the pressure units
-        fsp = fsp/(10000*160.21766208)
-        bsp = bsp/(10000*160.21766208)
-        flp = flp/(10000*160.21766208)
-        blp = blp/(10000*160.21766208)
-
         #scale volume per number of atoms
         fsv = fsv/natoms1
         bsv = bsv/natoms1
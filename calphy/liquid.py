@@ -68,7 +68,7 @@ class Liquid(cph.Phase):
 
             self.logger.info("Starting melting cycle with thigh temp %f, factor %f"%(self.calc._temperature_high, thmult))
             factor = (self.calc._temperature_high/self.calc._temperature)*thmult
-            lmp.velocity("all create", self.calc._temperature*factor, np.random.randint(1, 10000))
+            lmp.velocity("all create", self.calc._temperature*factor, self.get_seed())
             self.fix_nose_hoover(lmp, temp_start_factor=factor, temp_end_factor=factor)
             lmp.run(int(self.calc.md.n_small_steps))
             self.unfix_nose_hoover(lmp)
@@ -84,9 +84,10 @@ class Liquid(cph.Phase):
         
         #if melting cycle is over and still not melted, raise error
         if not melted:
-            lmp.close()
+            self.close_lammps_object(lmp)
             raise SolidifiedError("Liquid system did not melt, maybe try a higher thigh temperature.")
 
+    @cph.close_lammps_on_error
     def run_averaging(self):
         """
         Run averaging routine
@@ -110,8 +111,7 @@ class Liquid(cph.Phase):
         At the end of the run, the averaged box dimensions are calculated. 
         """
         #create lammps object
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         lmp.command(f'pair_style {self.calc._pair_style_with_options[0]}')
 
@@ -123,14 +123,10 @@ class Liquid(cph.Phase):
         lmp = ph.set_mass(lmp, self.calc)
 
         #Melt regime for the liquid
-        lmp.velocity("all create", self.calc._temperature_high, np.random.randint(1, 10000))
+        lmp.velocity("all create", self.calc._temperature_high, self.get_seed())
         
         #add some computes
-        lmp.command("variable         mvol equal vol")
-        lmp.command("variable         mlx equal lx")
-        lmp.command("variable         mly equal ly")
-        lmp.command("variable         mlz equal lz")
-        lmp.command("variable         mpress equal press") 
+        self.define_averaging_variables(lmp)
 
         #MELT
         if self.calc.melting_cycle:
@@ -147,12 +143,12 @@ class Liquid(cph.Phase):
         self.check_if_solidfied(lmp, "traj.equilibration_stage1.dat")
         self.dump_current_snapshot(lmp, "traj.equilibration_stage2.dat")
         lmp = ph.write_data(lmp, "conf.equilibration.data")
-        lmp.close()
 
 
 
 
 
+    @cph.close_lammps_on_error
     def run_integration(self, iteration=1):
         """
         Run integration routine
@@ -171,8 +167,7 @@ class Liquid(cph.Phase):
         Run the integration routine where the initial and final systems are connected using
         the lambda parameter. See algorithm 4 in publication.
         """
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         # Adiabatic switching parameters.
         lmp.command("variable        li       equal   1.0")
@@ -194,117 +189,92 @@ class Liquid(cph.Phase):
         #remap the box to get the correct pressure
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
-        
-        lmp.command("fix              f1 all nve")
-        lmp.command("fix              f2 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
-                                        np.random.randint(1, 10000)))
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
-
-        lmp.command("unfix            f1")
-        lmp.command("unfix            f2")
+        #collect the switching commands and send them to LAMMPS at once
+        cmds = []
+        #the integrator and thermostat are kept for all the stages below
+        cmds.append("fix              f1 all nve")
+        cmds.append("fix              f2 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
+                                        self.get_seed()))
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
 
         #---------------------------------------------------------------
         # FWD cycle
         #---------------------------------------------------------------
 
-        lmp.command("variable         flambda equal ramp(${li},${lf})")
-        lmp.command("variable         blambda equal 1.0-v_flambda")
+        cmds.append("variable         flambda equal ramp(${li},${lf})")
+        cmds.append("variable         blambda equal 1.0-v_flambda")
 
-        lmp.command("pair_style       hybrid/scaled v_flambda %s v_blambda ufm 7.5"%self.calc._pair_style_with_options[0])
+        cmds.append("pair_style       hybrid/scaled v_flambda %s v_blambda ufm 7.5"%self.calc._pair_style_with_options[0])
 
         pc =  self.calc.pair_coeff[0]
         pcraw = pc.split()
         pcnew = " ".join([*pcraw[:2], *[self.calc._pair_style_names[0],], *pcraw[2:]])
 
-        lmp.command("pair_coeff       %s"%pcnew)
-        lmp.command("pair_coeff       * * ufm %f 1.5"%self.eps)
+        cmds.append("pair_coeff       %s"%pcnew)
+        cmds.append("pair_coeff       * * ufm %f 1.5"%self.eps)
 
-        lmp.command("compute          c1 all pair %s"%self.calc._pair_style_names[0])
-        lmp.command("compute          c2 all pair ufm")
+        cmds.append("compute          c1 all pair %s"%self.calc._pair_style_names[0])
+        cmds.append("compute          c2 all pair ufm")
 
-        lmp.command("variable         step equal step")
-        lmp.command("variable         dU1 equal c_c1/atoms")
-        lmp.command("variable         dU2 equal c_c2/atoms")
+        cmds.append("variable         step equal step")
+        cmds.append("variable         dU1 equal c_c1/atoms")
+        cmds.append("variable         dU2 equal c_c2/atoms")
 
-        lmp.command("thermo_style     custom step v_dU1 v_dU2")
-        lmp.command("thermo           1000")
+        cmds.append("thermo_style     custom step v_dU1 v_dU2")
+        cmds.append("thermo           1000")
 
 
-        lmp.command("velocity         all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, np.random.randint(1, 10000)))
+        cmds.append("velocity         all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, self.get_seed()))
 
-        lmp.command("fix              f1 all nve")
-        lmp.command("fix              f2 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
-                                        np.random.randint(1, 10000)))
-        lmp.command("compute          Tcm all temp/com")
-        lmp.command("fix_modify       f2 temp Tcm")
+        cmds.append("compute          Tcm all temp/com")
+        cmds.append("fix_modify       f2 temp Tcm")
 
-        lmp.command("fix              f3 all print 1 \"${dU1} ${dU2} ${flambda}\" screen no file forward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_switching_steps)
+        cmds.append("fix              f3 all print %d \"${dU1} ${dU2} ${flambda}\" screen no file forward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_switching_steps)
 
-        lmp.command("unfix            f1")
-        lmp.command("unfix            f2")
-        lmp.command("unfix            f3")
-        lmp.command("uncompute        c1")
-        lmp.command("uncompute        c2")
+        cmds.append("unfix            f3")
+        cmds.append("uncompute        c1")
+        cmds.append("uncompute        c2")
 
         #---------------------------------------------------------------
         # EQBRM cycle
         #---------------------------------------------------------------
 
-        lmp.command("pair_style       ufm 7.5")
-        lmp.command("pair_coeff       * * %f 1.5"%self.eps)
-
-        lmp.command("thermo_style     custom step pe")
-        lmp.command("thermo           1000")
-
-        lmp.command("fix              f1 all nve")
-        lmp.command("fix              f2 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
-                                        np.random.randint(1, 10000)))
-        lmp.command("fix_modify       f2 temp Tcm")
+        cmds.append("pair_style       ufm 7.5")
+        cmds.append("pair_coeff       * * %f 1.5"%self.eps)
 
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("thermo_style     custom step pe")
+        cmds.append("thermo           1000")
 
-        lmp.command("unfix            f1")
-        lmp.command("unfix            f2")
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
 
         #---------------------------------------------------------------
         # BKD cycle
         #---------------------------------------------------------------
 
-        lmp.command("variable         flambda equal ramp(${lf},${li})")
-        lmp.command("variable         blambda equal 1.0-v_flambda")
+        cmds.append("variable         flambda equal ramp(${lf},${li})")
+        cmds.append("variable         blambda equal 1.0-v_flambda")
 
-        lmp.command("pair_style       hybrid/scaled v_flambda %s v_blambda ufm 7.5"%self.calc._pair_style_with_options[0])
+        cmds.append("pair_style       hybrid/scaled v_flambda %s v_blambda ufm 7.5"%self.calc._pair_style_with_options[0])
 
-        lmp.command("pair_coeff       %s"%pcnew)
-        lmp.command("pair_coeff       * * ufm %f 1.5"%self.eps)
+        cmds.append("pair_coeff       %s"%pcnew)
+        cmds.append("pair_coeff       * * ufm %f 1.5"%self.eps)
 
-        lmp.command("compute          c1 all pair %s"%self.calc._pair_style_names[0])
-        lmp.command("compute          c2 all pair ufm")
+        cmds.append("compute          c1 all pair %s"%self.calc._pair_style_names[0])
+        cmds.append("compute          c2 all pair ufm")
 
-        lmp.command("variable         step equal step")
-        lmp.command("variable         dU1 equal c_c1/atoms")
-        lmp.command("variable         dU2 equal c_c2/atoms")
+        cmds.append("thermo_style     custom step v_dU1 v_dU2")
+        cmds.append("thermo           1000")
 
-        lmp.command("thermo_style     custom step v_dU1 v_dU2")
-        lmp.command("thermo           1000")
+        cmds.append("fix              f3 all print %d \"${dU1} ${dU2} ${flambda}\" screen no file backward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_switching_steps)
 
-        lmp.command("fix              f1 all nve")
-        lmp.command("fix              f2 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
-                                        np.random.randint(1, 10000)))
-        lmp.command("fix_modify       f2 temp Tcm")
-
-        lmp.command("fix              f3 all print 1 \"${dU1} ${dU2} ${flambda}\" screen no file backward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_switching_steps)
-
-        lmp.command("unfix            f1")
-        lmp.command("unfix            f2")
-        lmp.command("unfix            f3")
-        lmp.command("uncompute        c1")
-        lmp.command("uncompute        c2")
-        
-        #close object
-        lmp.close()
+        cmds.append("unfix            f1")
+        cmds.append("unfix            f2")
+        cmds.append("unfix            f3")
+        cmds.append("uncompute        c1")
+        cmds.append("uncompute        c2")
+        lmp.command(cmds)
     
     def thermodynamic_integration(self):
         """
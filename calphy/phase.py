@@ -30,13 +30,51 @@ import yaml
 import copy
 import os
 import shutil
+import threading
+import functools
 
-import pyscal3.traj_process as ptp
 from calphy.integrators import *
 import calphy.helpers as ph
 from calphy.errors import *
 from calphy.input import generate_metadata
 
+#variables for the averaged box dimensions and pressure
+_AVERAGING_VARIABLES = ("variable         mvol equal vol",
+    "variable         mlx equal lx",
+    "variable         mly equal ly",
+    "variable         mlz equal lz",
+    "variable         mpress equal press")
+
+#templates for the thermostat and barostat fixes, filled in with str.format_map
+_NOSE_HOOVER_TEMPLATE = """fix              nh1 all npt temp {temp_start:f} {temp_end:f} {thermostat_damping:f} {iso} {press_start:f} {press_end:f} {barostat_damping:f}"""
+
+_BERENDSEN_TEMPLATE = """fix              b1a all nve
+fix              b1b all temp/berendsen {temp_start:f} {temp_end:f} {thermostat_damping:f}
+fix              b1c all press/berendsen {iso} {press_start:f} {press_end:f} {barostat_damping:f}"""
+
+def close_lammps_on_error(method):
+    """
+    Decorate a method of Phase so that the LAMMPS instance of the current
+    thread is closed, and not reused, if the method raises an exception
+
+    Parameters
+    ----------
+    method : callable
+        method which creates its LAMMPS object with `create_lammps_object`
+
+    Returns
+    -------
+    wrapper : callable
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            self.close_lammps_object()
+            raise
+    return wrapper
+
 class Phase:
     """
     Class for free energy calculation.
@@ -152,6 +190,12 @@ class Phase:
         self.natoms = self.calc._natoms        
         self.logger.info("%d atoms in %d cells on %d cores"%(self.natoms, self.ncells, self.cores))
 
+        #random number generator for the seeds passed to LAMMPS
+        self._rng = np.random.default_rng(self.calc.md.seed)
+
+        #running LAMMPS instances, one per thread, reused across runs
+        self._lammps_instances = {}
+
         #reference system props; may not be always used
         #TODO : Add option to customize UFM parameters
         self.eps = self.calc._temperature*50.0*kb
@@ -205,6 +249,75 @@ class Phase:
             else:
                 org_dict[key] = val        
                 
+    def get_seed(self):
+        """
+        Get a random seed for LAMMPS commands
+
+        Returns
+        -------
+        seed : int
+            seed between 1 and 900000000, the largest value accepted by LAMMPS
+        """
+        return int(self._rng.integers(1, 900000000))
+
+    def create_lammps_object(self, script_mode=False, logfile=None):
+        """
+        Create a LAMMPS object, reusing the running instance of the current thread
+
+        Parameters
+        ----------
+        script_mode : bool, optional
+            if True, a new `LammpsScript` object is returned. Default False
+
+        logfile : string, optional
+            name of the LAMMPS log file, only used when a new instance is started.
+            Default None, which uses the LAMMPS default
+
+        Returns
+        -------
+        lmp : LammpsLibrary object
+        """
+        key = threading.get_ident()
+        cmdargs = self.calc.md.cmdargs
+        if logfile is not None:
+            cmdargs = " ".join([cmdargs, "-log", logfile])
+        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
+            cmdargs, init_commands=self.calc.md.init_commands,
+            script_mode=script_mode, lmp=self._lammps_instances.get(key))
+        if not script_mode:
+            self._lammps_instances[key] = lmp
+        return lmp
+
+    def close_lammps_object(self, lmp=None):
+        """
+        Close a LAMMPS object so that it is not reused
+
+        Parameters
+        ----------
+        lmp : LammpsLibrary object, optional
+            object to close. Default None, which closes the instance of the current thread, if any
+        """
+        if lmp is None:
+            lmp = self._lammps_instances.pop(threading.get_ident(), None)
+            if lmp is None:
+                return
+        for key, val in list(self._lammps_instances.items()):
+            if val is lmp:
+                del self._lammps_instances[key]
+        lmp.close()
+
+    def close(self):
+        """
+        Close all running LAMMPS instances
+        """
+        for lmp in list(self._lammps_instances.values()):
+            self.close_lammps_object(lmp)
+
+    def __del__(self):
+        #the constructor might have failed before the instances were set up
+        if getattr(self, "_lammps_instances", None):
+            self.close()
+
     def dump_current_snapshot(self, lmp, filename):
         """
         """
@@ -235,19 +348,74 @@ class Phase:
     def check_if_melted(self, lmp, filename):
         """
         """
+        #the fraction can never be below zero, skip the solid detection
+        if self.calc.tolerance.solid_fraction == 0:
+            return
         solids = ph.find_solid_fraction(os.path.join(self.simfolder, filename))
         if (solids/lmp.natoms < self.calc.tolerance.solid_fraction):
-            lmp.close()
+            self.close_lammps_object(lmp)
             raise MeltedError("System melted, increase size or reduce temp!\n Solid detection algorithm only works with BCC/FCC/HCP/SC/DIA. Detection algorithm can be turned off by setting:\n tolerance.solid_fraction: 0")
 
     def check_if_solidfied(self, lmp, filename):
         """
         """
+        #the fraction can never exceed one, skip the solid detection
+        if self.calc.tolerance.liquid_fraction >= 1:
+            return
         solids = ph.find_solid_fraction(os.path.join(self.simfolder, filename))
         if (solids/lmp.natoms > self.calc.tolerance.liquid_fraction):
-            lmp.close()
+            self.close_lammps_object(lmp)
             raise SolidifiedError('System solidified, increase temperature')
 
+    def define_averaging_variables(self, lmp):
+        """
+        Define the variables for the averaged box dimensions and pressure
+
+        Parameters
+        ----------
+        lmp: LAMMPS object
+
+        Returns
+        -------
+        None
+        """
+        lmp.command(list(_AVERAGING_VARIABLES))
+
+    def _thermostat_params(self, temp_start_factor=1.0, temp_end_factor=1.0, 
+        press_start_factor=1.0, press_end_factor=1.0, stage=0):
+        """
+        Collect the values for the thermostat and barostat templates
+
+        Parameters
+        ----------
+        temp_start_factor : float, optional
+            factor multiplied with the temperature to get the start temperature. Default 1.0
+
+        temp_end_factor : float, optional
+            factor multiplied with the temperature to get the end temperature. Default 1.0
+
+        press_start_factor : float, optional
+            factor multiplied with the pressure to get the start pressure. Default 1.0
+
+        press_end_factor : float, optional
+            factor multiplied with the pressure to get the end pressure. Default 1.0
+
+        stage : int, optional
+            index of the thermostat and barostat damping values to use. Default 0
+
+        Returns
+        -------
+        params : dict
+            values to fill in the thermostat and barostat templates
+        """
+        return {"temp_start": temp_start_factor*self.calc._temperature,
+                "temp_end": temp_end_factor*self.calc._temperature,
+                "thermostat_damping": self.calc.md.thermostat_damping[stage],
+                "iso": self.iso,
+                "press_start": press_start_factor*self.calc._pressure,
+                "press_end": press_end_factor*self.calc._pressure,
+                "barostat_damping": self.calc.md.barostat_damping[stage]}
+
     def fix_nose_hoover(self, lmp, temp_start_factor=1.0, temp_end_factor=1.0, 
         press_start_factor=1.0, press_end_factor=1.0, 
         stage=0, ensemble="npt"):
@@ -256,34 +424,70 @@ class Phase:
 
         Parameters
         ----------
-        None
+        lmp : LAMMPS object
+
+        temp_start_factor : float, optional
+            factor multiplied with the temperature to get the start temperature. Default 1.0
+
+        temp_end_factor : float, optional
+            factor multiplied with the temperature to get the end temperature. Default 1.0
+
+        press_start_factor : float, optional
+            factor multiplied with the pressure to get the start pressure. Default 1.0
+
+        press_end_factor : float, optional
+            factor multiplied with the pressure to get the end pressure. Default 1.0
+
+        stage : int, optional
+            index of the thermostat and barostat damping values to use. Default 0
+
+        ensemble : string, optional
+            not used, the fixes are always applied in the NPT ensemble. Default "npt"
 
         Returns
         -------
         None
         """
-        lmp.command("fix              nh1 all npt temp %f %f %f %s %f %f %f"%(temp_start_factor*self.calc._temperature, 
-                        temp_end_factor*self.calc._temperature, self.calc.md.thermostat_damping[stage], 
-                        self.iso, press_start_factor*self.calc._pressure, press_end_factor*self.calc._pressure, self.calc.md.barostat_damping[stage]))
+        params = self._thermostat_params(temp_start_factor=temp_start_factor, temp_end_factor=temp_end_factor,
+            press_start_factor=press_start_factor, press_end_factor=press_end_factor, stage=stage)
+        lmp.command(_NOSE_HOOVER_TEMPLATE.format_map(params))
 
 
     def fix_berendsen(self, lmp, temp_start_factor=1.0, temp_end_factor=1.0, 
         press_start_factor=1.0, press_end_factor=1.0, 
         stage=0, ensemble="npt"):
         """
-        Fix Nose-Hoover thermostat and barostat
+        Fix Berendsen thermostat and barostat
 
         Parameters
         ----------
-        None
+        lmp : LAMMPS object
+
+        temp_start_factor : float, optional
+            factor multiplied with the temperature to get the start temperature. Default 1.0
+
+        temp_end_factor : float, optional
+            factor multiplied with the temperature to get the end temperature. Default 1.0
+
+        press_start_factor : float, optional
+            factor multiplied with the pressure to get the start pressure. Default 1.0
+
+        press_end_factor : float, optional
+            factor multiplied with the pressure to get the end pressure. Default 1.0
+
+        stage : int, optional
+            index of the thermostat and barostat damping values to use. Default 0
+
+        ensemble : string, optional
+            not used, the fixes are always applied in the NPT ensemble. Default "npt"
 
         Returns
         -------
         None
         """
-        lmp.command("fix              b1a all nve")
-        lmp.command("fix              b1b all temp/berendsen %f %f %f"%(temp_start_factor*self.calc._temperature, temp_end_factor*self.calc._temperature, self.calc.md.thermostat_damping[stage]))
-        lmp.command("fix              b1c all press/berendsen %s %f %f %f"%(self.iso, press_start_factor*self.calc._pressure, press_end_factor*self.calc._pressure, self.calc.md.barostat_damping[stage]))
+        params = self._thermostat_params(temp_start_factor=temp_start_factor, temp_end_factor=temp_end_factor,
+            press_start_factor=press_start_factor, press_end_factor=press_end_factor, stage=stage)
+        lmp.command(_BERENDSEN_TEMPLATE.format_map(params).split("\n"))
 
     def unfix_nose_hoover(self, lmp):
         """
@@ -332,7 +536,7 @@ class Phase:
         Each method should close all the fixes. Run a small eqbr routine to achieve zero pressure        
         """
         #set velocity
-        lmp.command("velocity         all create %f %d"%(self.calc._temperature, np.random.randint(1, 10000)))
+        lmp.command("velocity         all create %f %d"%(self.calc._temperature, self.get_seed()))
         
         #apply fixes depending on thermostat/barostat
         if self.calc.equilibration_control == "nose-hoover":
@@ -374,7 +578,7 @@ class Phase:
         can prevent the issue.         
         """
         #create velocity
-        lmp.command("velocity         all create %f %d"%(0.25*self.calc._temperature, np.random.randint(1, 10000)))
+        lmp.command("velocity         all create %f %d"%(0.25*self.calc._temperature, self.get_seed()))
 
         #for Nose-Hoover thermo/baro combination
         if self.calc.equilibration_control == "nose-hoover":
@@ -471,7 +675,7 @@ class Phase:
             ncount = int(self.calc.md.n_small_steps)//int(self.calc.md.n_every_steps*self.calc.md.n_repeat_steps)
             #now we can check if it converted
             file = os.path.join(self.simfolder, "avg.dat")
-            lx, ly, lz, ipress = np.loadtxt(file, usecols=(1, 2, 3, 4), unpack=True)
+            lx, ly, lz, ipress = ph.read_columns(file, usecols=[1, 2, 3, 4])
             
             lxpc = ipress
             mean = np.mean(lxpc)
@@ -496,7 +700,7 @@ class Phase:
             laststd = std
         
         if not converged:
-            lmp.close()
+            self.close_lammps_object(lmp)
             raise ValueError("Pressure did not converge after MD runs, maybe change lattice_constant and try?")
 
         #unfix thermostat and barostat
@@ -555,7 +759,7 @@ class Phase:
     def run_iterative_constrained_pressure_convergence(self, lmp):
         """
         """
-        lmp.command("velocity         all create %f %d"%(self.calc._temperature, np.random.randint(1, 10000)))
+        lmp.command("velocity         all create %f %d"%(self.calc._temperature, self.get_seed()))
         lmp.command("fix              1 all nvt temp %f %f %f"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1]))
         lmp.command("thermo_style     custom step pe press vol etotal temp lx ly lz")
         lmp.command("thermo           10")
@@ -585,7 +789,7 @@ class Phase:
         lmp.command("unfix            2")
 
         if not converged:
-            lmp.close()
+            self.close_lammps_object(lmp)
             raise ValueError("pressure did not converge")
 
     def process_pressure(self,):
@@ -596,7 +800,7 @@ class Phase:
         
         #now we can check if it converted
         file = os.path.join(self.simfolder, "avg.dat")
-        lx, ly, lz, ipress = np.loadtxt(file, usecols=(1, 2, 3, 4), unpack=True)
+        lx, ly, lz, ipress = ph.read_columns(file, usecols=[1, 2, 3, 4])
         lxpc = ipress
         mean = np.mean(lxpc)
         std = np.std(lxpc)
@@ -610,7 +814,7 @@ class Phase:
             ncount = int(self.calc.md.n_small_steps)//int(self.calc.md.n_every_steps*self.calc.md.n_repeat_steps)
 
         file = os.path.join(self.simfolder, "avg.dat")
-        lx, ly, lz, ipress = np.loadtxt(file, usecols=(1, 2, 3, 4), unpack=True)        
+        lx, ly, lz, ipress = ph.read_columns(file, usecols=[1, 2, 3, 4])        
         lxpc = ipress
         mean = np.mean(lxpc)
         std = np.std(lxpc)
@@ -629,7 +833,7 @@ class Phase:
     def run_minimal_constrained_pressure_convergence(self, lmp):
         """
         """
-        lmp.command("velocity         all create %f %d"%(self.calc._temperature, np.random.randint(1, 10000)))
+        lmp.command("velocity         all create %f %d"%(self.calc._temperature, self.get_seed()))
         lmp.command("fix              1 all nvt temp %f %f %f"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1]))
         lmp.command("thermo_style     custom step pe press vol etotal temp lx ly lz")
         lmp.command("thermo           10")
@@ -707,6 +911,7 @@ class Phase:
                 self.logger.info("- 10.1016/j.commatsci.2018.12.029")
                 self.logger.info("- 10.1063/1.4967775")
 
+    @close_lammps_on_error
     def reversible_scaling(self, iteration=1):
         """
         Perform reversible scaling calculation in NPT
@@ -733,8 +938,7 @@ class Phase:
         pf = lf*pi
 
         #create lammps object
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         lmp.command("echo              log")
         lmp.command("variable          li equal %f"%li)
@@ -754,51 +958,58 @@ class Phase:
         #remap the box to get the correct pressure
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
+        #collect commands between logging points, and send them to LAMMPS at once
+        cmds = []
+
         #set thermostat and run equilibrium
         if self.calc.npt:
-            lmp.command("fix               f1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1], 
+            cmds.append("fix               f1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1], 
                 self.iso, pi, pi, self.calc.md.barostat_damping[1]))
         else:
-            lmp.command("fix               f1 all nvt temp %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1]))
+            cmds.append("fix               f1 all nvt temp %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1]))
         
         self.logger.info(f'Starting equilibration: {iteration}')
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        lmp.command(cmds)
         self.logger.info(f'Finished equilibration: {iteration}')
+        cmds = []
 
-        lmp.command("unfix             f1")
+        cmds.append("unfix             f1")
 
         #now fix com
-        lmp.command("variable         xcm equal xcm(all,x)")
-        lmp.command("variable         ycm equal xcm(all,y)")
-        lmp.command("variable         zcm equal xcm(all,z)")
+        cmds.append("variable         xcm equal xcm(all,x)")
+        cmds.append("variable         ycm equal xcm(all,y)")
+        cmds.append("variable         zcm equal xcm(all,z)")
 
         if self.calc.npt:
-            lmp.command("fix               f1 all npt temp %f %f %f %s %f %f %f fixedpoint ${xcm} ${ycm} ${zcm}"%(t0, t0, self.calc.md.thermostat_damping[1], 
+            cmds.append("fix               f1 all npt temp %f %f %f %s %f %f %f fixedpoint ${xcm} ${ycm} ${zcm}"%(t0, t0, self.calc.md.thermostat_damping[1], 
                 self.iso, pi, pi, self.calc.md.barostat_damping[1]))
         else:
-            lmp.command("fix               f1 all nvt temp %f %f %f fixedpoint ${xcm} ${ycm} ${zcm}"%(t0, t0, self.calc.md.thermostat_damping[1]))
+            cmds.append("fix               f1 all nvt temp %f %f %f fixedpoint ${xcm} ${ycm} ${zcm}"%(t0, t0, self.calc.md.thermostat_damping[1]))
 
         #compute com and modify fix
-        lmp.command("compute           tcm all temp/com")
-        lmp.command("fix_modify        f1 temp tcm")
+        cmds.append("compute           tcm all temp/com")
+        cmds.append("fix_modify        f1 temp tcm")
 
-        lmp.command("variable          step    equal step")
-        lmp.command("variable          dU      equal c_thermo_pe/atoms")        
-        lmp.command("thermo_style      custom step pe c_tcm press vol")
-        lmp.command("thermo            10000")
+        cmds.append("variable          step    equal step")
+        cmds.append("variable          dU      equal c_thermo_pe/atoms")        
+        cmds.append("thermo_style      custom step pe c_tcm press vol")
+        cmds.append("thermo            10000")
 
         #create velocity and equilibriate
-        lmp.command("velocity          all create %f %d mom yes rot yes dist gaussian"%(t0, np.random.randint(1, 10000)))
+        cmds.append("velocity          all create %f %d mom yes rot yes dist gaussian"%(t0, self.get_seed()))
 
         self.logger.info(f'Starting equilibration with constrained com: {iteration}')
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        lmp.command(cmds)
         self.logger.info(f'Finished equilibration with constrained com: {iteration}')
+        cmds = []
         
-        lmp.command("variable         flambda equal ramp(${li},${lf})")
-        lmp.command("variable         blambda equal ramp(${lf},${li})")
-        lmp.command("variable         fscale equal v_flambda-1.0")
-        lmp.command("variable         bscale equal v_blambda-1.0")
-        lmp.command("variable         one equal 1.0")
+        cmds.append("variable         flambda equal ramp(${li},${lf})")
+        cmds.append("variable         blambda equal ramp(${lf},${li})")
+        cmds.append("variable         fscale equal v_flambda-1.0")
+        cmds.append("variable         bscale equal v_blambda-1.0")
+        cmds.append("variable         one equal 1.0")
 
         #set up potential
         pc =  self.calc.pair_coeff[0]
@@ -806,69 +1017,75 @@ class Phase:
         pcnew1 = " ".join([*pcraw[:2], *[self.calc._pair_style_names[0],], "1", *pcraw[2:]])
         pcnew2 = " ".join([*pcraw[:2], *[self.calc._pair_style_names[0],], "2", *pcraw[2:]])
 
-        lmp.command("pair_style       hybrid/scaled v_one %s v_fscale %s"%(self.calc._pair_style_with_options[0], self.calc._pair_style_with_options[0]))
-        lmp.command("pair_coeff       %s"%pcnew1)
-        lmp.command("pair_coeff       %s"%pcnew2)
+        cmds.append("pair_style       hybrid/scaled v_one %s v_fscale %s"%(self.calc._pair_style_with_options[0], self.calc._pair_style_with_options[0]))
+        cmds.append("pair_coeff       %s"%pcnew1)
+        cmds.append("pair_coeff       %s"%pcnew2)
 
-        lmp.command("fix               f3 all print 1 \"${dU} $(press) $(vol) ${flambda}\" screen no file ts.forward_%d.dat"%iteration)
+        cmds.append("fix               f3 all print %d \"${dU} $(press) $(vol) ${flambda}\" screen no file ts.forward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
 
         if self.calc.n_print_steps > 0:
-            lmp.command("dump              d1 all custom %d traj.ts.forward_%d.dat id type mass x y z vx vy vz"%(self.calc.n_print_steps,
+            cmds.append("dump              d1 all custom %d traj.ts.forward_%d.dat id type mass x y z vx vy vz"%(self.calc.n_print_steps,
                 iteration))
         
         self.logger.info(f'Started forward sweep: {iteration}')
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
+        lmp.command(cmds)
         self.logger.info(f'Finished forward sweep: {iteration}')
+        cmds = []
 
         #unfix
-        lmp.command("unfix             f3")
+        cmds.append("unfix             f3")
         #lmp.command("unfix             f1")
 
         if self.calc.n_print_steps > 0:
-            lmp.command("undump           d1")
+            cmds.append("undump           d1")
 
         #switch potential
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+
+        lmp.command(cmds)
+        cmds = []
 
         #check melting or freezing
         if not self.calc.script_mode:
-            self.dump_current_snapshot(lmp, "traj.temp.dat")
+            self.dump_current_snapshot(lmp, "traj.temp_%d.dat"%iteration)
             if solid:
-                self.check_if_melted(lmp, "traj.temp.dat")
+                self.check_if_melted(lmp, "traj.temp_%d.dat"%iteration)
             else:
-                self.check_if_solidfied(lmp, "traj.temp.dat")
+                self.check_if_solidfied(lmp, "traj.temp_%d.dat"%iteration)
 
         lmp = ph.set_potential(lmp, self.calc)
 
         #reverse scaling
-        lmp.command("variable         flambda equal ramp(${li},${lf})")
-        lmp.command("variable         blambda equal ramp(${lf},${li})")
-        lmp.command("variable         fscale equal v_flambda-1.0")
-        lmp.command("variable         bscale equal v_blambda-1.0")
-        lmp.command("variable         one equal 1.0")
+        cmds.append("variable         flambda equal ramp(${li},${lf})")
+        cmds.append("variable         blambda equal ramp(${lf},${li})")
+        cmds.append("variable         fscale equal v_flambda-1.0")
+        cmds.append("variable         bscale equal v_blambda-1.0")
+        cmds.append("variable         one equal 1.0")
 
-        lmp.command("pair_style       hybrid/scaled v_one %s v_bscale %s"%(self.calc._pair_style_with_options[0], self.calc._pair_style_with_options[0]))
-        lmp.command("pair_coeff       %s"%pcnew1)
-        lmp.command("pair_coeff       %s"%pcnew2)
+        cmds.append("pair_style       hybrid/scaled v_one %s v_bscale %s"%(self.calc._pair_style_with_options[0], self.calc._pair_style_with_options[0]))
+        cmds.append("pair_coeff       %s"%pcnew1)
+        cmds.append("pair_coeff       %s"%pcnew2)
 
         #apply fix and perform switching        
-        lmp.command("fix               f3 all print 1 \"${dU} $(press) $(vol) ${blambda}\" screen no file ts.backward_%d.dat"%iteration)
+        cmds.append("fix               f3 all print %d \"${dU} $(press) $(vol) ${blambda}\" screen no file ts.backward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
 
         if self.calc.n_print_steps > 0:
-            lmp.command("dump              d1 all custom %d traj.ts.backward_%d.dat id type mass x y z vx vy vz"%(self.calc.n_print_steps,
+            cmds.append("dump              d1 all custom %d traj.ts.backward_%d.dat id type mass x y z vx vy vz"%(self.calc.n_print_steps,
                 iteration))
 
         self.logger.info(f'Started backward sweep: {iteration}')
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
+        lmp.command(cmds)
         self.logger.info(f'Finished backward sweep: {iteration}')
+        cmds = []
         
-        lmp.command("unfix             f3")
+        cmds.append("unfix             f3")
 
         if self.calc.n_print_steps > 0:
-            lmp.command("undump           d1")
+            cmds.append("undump           d1")
         
-        #close the object
-        lmp.close()
+        lmp.command(cmds)
 
         self.logger.info("Please cite the following publications:")
         if self.calc.mode == "mts":
@@ -899,6 +1116,7 @@ class Phase:
         if return_values:
             return res
 
+    @close_lammps_on_error
     def temperature_scaling(self, iteration=1):
         """
         Perform temperature scaling calculation in NPT
@@ -924,8 +1142,7 @@ class Phase:
         pf = lf*p0
 
         #create lammps object
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         lmp.command("echo              log")
         lmp.command("variable          li equal %f"%li)
@@ -946,54 +1163,58 @@ class Phase:
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
 
+        #collect the commands and send them to LAMMPS at once
+        cmds = []
         #equilibrate first
-        lmp.command("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, p0, p0, self.calc.md.barostat_damping[1]))
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
-        lmp.command("unfix             1")
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("unfix             1")
 
 
         #now scale system to final temp, thereby recording enerfy at every step
-        lmp.command("variable          step    equal step")
-        lmp.command("variable          dU      equal pe/atoms")
-        lmp.command("variable          lambda equal ramp(${li},${lf})")
+        cmds.append("variable          step    equal step")
+        cmds.append("variable          dU      equal pe/atoms")
+        cmds.append("variable          lambda equal ramp(${li},${lf})")
 
-        lmp.command("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, tf, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, tf, self.calc.md.thermostat_damping[1],
                                         self.iso, p0, pf, self.calc.md.barostat_damping[1]))
-        lmp.command("fix               f3 all print 1 \"${dU} $(press) $(vol) ${lambda}\" screen no file ts.forward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
+        cmds.append("fix               f3 all print %d \"${dU} $(press) $(vol) ${lambda}\" screen no file ts.forward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
 
-        lmp.command("unfix             f2")
-        lmp.command("unfix             f3")
+        cmds.append("unfix             f2")
+        cmds.append("unfix             f3")
 
-        lmp.command("fix               1 all npt temp %f %f %f %s %f %f %f"%(tf, tf, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               1 all npt temp %f %f %f %s %f %f %f"%(tf, tf, self.calc.md.thermostat_damping[1],
                                         self.iso, pf, pf, self.calc.md.barostat_damping[1]))
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
-        lmp.command("unfix             1")
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("unfix             1")
 
         #check melting or freezing
-        lmp.command("dump              2 all custom 1 traj.temp.dat id type mass x y z vx vy vz")
-        lmp.command("run               0")
-        lmp.command("undump            2")
+        cmds.append("dump              2 all custom 1 traj.temp_%d.dat id type mass x y z vx vy vz"%iteration)
+        cmds.append("run               0")
+        cmds.append("undump            2")
+        lmp.command(cmds)
+        cmds = []
         
         if not self.calc.script_mode:
-            self.dump_current_snapshot(lmp, "traj.temp.dat")
+            self.dump_current_snapshot(lmp, "traj.temp_%d.dat"%iteration)
             if solid:
-                self.check_if_melted(lmp, "traj.temp.dat")
+                self.check_if_melted(lmp, "traj.temp_%d.dat"%iteration)
             else:
-                self.check_if_solidfied(lmp, "traj.temp.dat")
+                self.check_if_solidfied(lmp, "traj.temp_%d.dat"%iteration)
 
         #start reverse loop
-        lmp.command("variable          lambda equal ramp(${lf},${li})")
+        cmds.append("variable          lambda equal ramp(${lf},${li})")
 
-        lmp.command("fix               f2 all npt temp %f %f %f %s %f %f %f"%(tf, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               f2 all npt temp %f %f %f %s %f %f %f"%(tf, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, pf, p0, self.calc.md.barostat_damping[1]))
-        lmp.command("fix               f3 all print 1 \"${dU} $(press) $(vol) ${lambda}\" screen no file ts.backward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
-
-        lmp.close()
+        cmds.append("fix               f3 all print %d \"${dU} $(press) $(vol) ${lambda}\" screen no file ts.backward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
+        lmp.command(cmds)
 
 
+    @close_lammps_on_error
     def pressure_scaling(self, iteration=1):
         """
         Perform pressure scaling calculation in NPT
@@ -1014,8 +1235,7 @@ class Phase:
         pf = self.calc._pressure_stop
 
         #create lammps object
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, self.calc.md.init_commands)
+        lmp = self.create_lammps_object()
 
         lmp.command("echo              log")
         lmp.command("variable          li equal %f"%li)
@@ -1037,43 +1257,44 @@ class Phase:
         #remap the box to get the correct pressure
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
+        #collect the commands and send them to LAMMPS at once
+        cmds = []
         #equilibrate first
-        lmp.command("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, p0, p0, self.calc.md.barostat_damping[1]))
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
-        lmp.command("unfix             1")
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("unfix             1")
 
 
         #now scale system to final temp, thereby recording enerfy at every step
-        lmp.command("variable          step    equal step")
-        lmp.command("variable          dU      equal pe/atoms")
-        lmp.command("variable          lambda equal ramp(${li},${lf})")
-        lmp.command("variable          pp equal ramp(${p0},${pf})")
+        cmds.append("variable          step    equal step")
+        cmds.append("variable          dU      equal pe/atoms")
+        cmds.append("variable          lambda equal ramp(${li},${lf})")
+        cmds.append("variable          pp equal ramp(${p0},${pf})")
 
-        lmp.command("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, p0, pf, self.calc.md.barostat_damping[1]))
-        lmp.command("fix               f3 all print 1 \"${dU} ${pp} $(vol) ${lambda}\" screen no file ps.forward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
+        cmds.append("fix               f3 all print %d \"${dU} ${pp} $(vol) ${lambda}\" screen no file ps.forward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
 
-        lmp.command("unfix             f2")
-        lmp.command("unfix             f3")
+        cmds.append("unfix             f2")
+        cmds.append("unfix             f3")
 
 
-        lmp.command("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               1 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, pf, pf, self.calc.md.barostat_damping[1]))
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
-        lmp.command("unfix             1")
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("unfix             1")
 
         #start reverse loop
-        lmp.command("variable          lambda equal ramp(${lf},${li})")
-        lmp.command("variable          pp equal ramp(${pf},${p0})")
+        cmds.append("variable          lambda equal ramp(${lf},${li})")
+        cmds.append("variable          pp equal ramp(${pf},${p0})")
 
-        lmp.command("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
+        cmds.append("fix               f2 all npt temp %f %f %f %s %f %f %f"%(t0, t0, self.calc.md.thermostat_damping[1],
                                         self.iso, pf, p0, self.calc.md.barostat_damping[1]))
-        lmp.command("fix               f3 all print 1 \"${dU} ${pp} $(vol) ${lambda}\" screen no file ps.backward_%d.dat"%iteration)
-        lmp.command("run               %d"%self.calc._n_sweep_steps)
-
-        lmp.close()
+        cmds.append("fix               f3 all print %d \"${dU} ${pp} $(vol) ${lambda}\" screen no file ps.backward_%d.dat"%(self.calc._n_switching_print_steps, iteration))
+        cmds.append("run               %d"%self.calc._n_sweep_steps)
+        lmp.command(cmds)
 
         self.logger.info("Please cite the following publications:")
         self.logger.info("- 10.1016/j.commatsci.2022.111275")
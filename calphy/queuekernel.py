@@ -82,24 +82,29 @@ def run_calculation(job):
     -------
     job : Phase class
     """
-    if job.calc.mode == "fe":
-        job = routine_fe(job)
-    elif job.calc.mode == "ts":
-        job = routine_ts(job)
-    elif job.calc.mode == "mts":
-        job = routine_only_ts(job)
-    elif job.calc.mode == "alchemy":
-        job = routine_alchemy(job)
-    elif job.calc.mode == "melting_temperature":
-        job.calculate_tm()
-    elif job.calc.mode == "tscale":
-        job = routine_tscale(job)
-    elif job.calc.mode == "pscale":
-        job = routine_pscale(job)
-    elif job.calc.mode == "composition_scaling":
-        job = routine_composition_scaling(job)
-    else:
-        raise ValueError("Mode should be either fe/ts/mts/alchemy/melting_temperature/tscale/pscale/composition_scaling")
+    try:
+        if job.calc.mode == "fe":
+            job = routine_fe(job)
+        elif job.calc.mode == "ts":
+            job = routine_ts(job)
+        elif job.calc.mode == "mts":
+            job = routine_only_ts(job)
+        elif job.calc.mode == "alchemy":
+            job = routine_alchemy(job)
+        elif job.calc.mode == "melting_temperature":
+            job.calculate_tm()
+        elif job.calc.mode == "tscale":
+            job = routine_tscale(job)
+        elif job.calc.mode == "pscale":
+            job = routine_pscale(job)
+        elif job.calc.mode == "composition_scaling":
+            job = routine_composition_scaling(job)
+        else:
+            raise ValueError("Mode should be either fe/ts/mts/alchemy/melting_temperature/tscale/pscale/composition_scaling")
+    finally:
+        #stop the LAMMPS instances kept alive between the runs, also if a run failed
+        if job.calc.mode != "melting_temperature":
+            job.close()
     return job
 
 def main():
@@ -142,21 +147,26 @@ def main():
             job = Solid(calculation=calc, simfolder=simfolder, log_to_screen=log_to_screen)
         os.chdir(simfolder)
 
-    if job.calc.mode == "fe":
-        _ = routine_fe(job)
-    elif job.calc.mode == "ts":
-        _ = routine_ts(job)
-    elif job.calc.mode == "mts":
-        _ = routine_only_ts(job)
-    elif job.calc.mode == "alchemy":
-        _ = routine_alchemy(job)
-    elif job.calc.mode == "melting_temperature":
-        job.calculate_tm()
-    elif job.calc.mode == "tscale":
-        _ = routine_tscale(job)
-    elif job.calc.mode == "pscale":
-        _ = routine_pscale(job)
-    elif job.calc.mode == "composition_scaling":
-        _ = routine_composition_scaling(job)
-    else:
-        raise ValueError("Mode should be either fe/ts/mts/alchemy/melting_temperature/tscale/pscale/composition_scaling")
+    try:
+        if job.calc.mode == "fe":
+            _ = routine_fe(job)
+        elif job.calc.mode == "ts":
+            _ = routine_ts(job)
+        elif job.calc.mode == "mts":
+            _ = routine_only_ts(job)
+        elif job.calc.mode == "alchemy":
+            _ = routine_alchemy(job)
+        elif job.calc.mode == "melting_temperature":
+            job.calculate_tm()
+        elif job.calc.mode == "tscale":
+            _ = routine_tscale(job)
+        elif job.calc.mode == "pscale":
+            _ = routine_pscale(job)
+        elif job.calc.mode == "composition_scaling":
+            _ = routine_composition_scaling(job)
+        else:
+            raise ValueError("Mode should be either fe/ts/mts/alchemy/melting_temperature/tscale/pscale/composition_scaling")
+    finally:
+        #stop the LAMMPS instances kept alive between the runs, also if a run failed
+        if job.calc.mode != "melting_temperature":
+            job.close()
@@ -25,6 +25,7 @@ import copy
 import numpy as np
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from mendeleev import element
 import yaml
 
@@ -209,6 +210,8 @@ class MeltingTemp:
 
         for i in range(100):
             returncode = self.run_jobs()
+            self.soljob.close()
+            self.lqdjob.close()
         
             if returncode == 3:
                 self.tmin = self.tmin + self.dtemp
@@ -320,6 +323,57 @@ class MeltingTemp:
             self.logger.info('Experimental melting temperature = %.2f K '%(self.calc._melting_temperature))
         self.logger.info('STATE: Tm = %.2f K +/- %.2f K'%(tm, tmerr))
 
+def run_iterations(job, method, label):
+    """
+    Run the independent integration cycles of a job
+
+    Parameters
+    ----------
+    job : Phase object
+        the job to run
+
+    method : callable
+        method of the job which runs a single cycle, accepts the keyword `iteration`
+
+    label : string
+        name of the cycle used for logging
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Each cycle runs in its own LAMMPS instance. If `n_parallel_iterations` is larger than one,
+    the cycles are run concurrently; the threads only wait on the LAMMPS processes.
+    Concurrent cycles write to separate LAMMPS log files, named after the method and the cycle.
+    """
+    def _run(iteration, parallel=False):
+        ts = time.time()
+        if parallel:
+            #start the instance of this cycle with its own log file, and stop it afterwards
+            #so that no idle instances are left once the worker thread is done
+            job.create_lammps_object(logfile="log.%s.%d.lammps"%(method.__name__, iteration))
+            try:
+                method(iteration=iteration)
+            finally:
+                job.close_lammps_object()
+        else:
+            method(iteration=iteration)
+        te = (time.time() - ts)
+        job.logger.info("%s cycle %d finished in %f s"%(label, iteration, te))
+
+    iterations = range(1, job.calc.n_iterations+1)
+    n_parallel = min(job.calc.n_parallel_iterations, job.calc.n_iterations)
+    if (n_parallel > 1) and (not job.calc.script_mode):
+        #the instance of the main thread would stay idle while the cycles run
+        job.close_lammps_object()
+        with ThreadPoolExecutor(max_workers=n_parallel) as executor:
+            list(executor.map(lambda iteration: _run(iteration, parallel=True), iterations))
+    else:
+        for iteration in iterations:
+            _run(iteration)
+
 def routine_fe(job):
     """
     Perform an FE calculation routine
@@ -330,11 +384,7 @@ def routine_fe(job):
     job.logger.info("Averaging routine finished in %f s"%te)
 
     #now run integration loops
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.run_integration(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("Integration cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.run_integration, "Integration")
 
     job.thermodynamic_integration()
     job.submit_report()
@@ -347,11 +397,7 @@ def routine_ts(job):
     routine_fe(job)
 
     #now do rev scale steps
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.reversible_scaling(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("TS integration cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.reversible_scaling, "TS integration")
     
     job.integrate_reversible_scaling(scale_energy=True)
     return job
@@ -366,11 +412,7 @@ def routine_only_ts(job):
     te = (time.time() - ts)
     job.logger.info("Averaging routine finished in %f s"%te)
 
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.reversible_scaling(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("TS integration cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.reversible_scaling, "TS integration")
     return job
 
 def routine_tscale(job):
@@ -380,11 +422,7 @@ def routine_tscale(job):
     routine_fe(job)
 
     #now do rev scale steps
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.temperature_scaling(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("Temperature scaling cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.temperature_scaling, "Temperature scaling")
     
     job.integrate_reversible_scaling(scale_energy=False)
     return job
@@ -396,11 +434,7 @@ def routine_pscale(job):
     routine_fe(job)
 
     #now do rev scale steps
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.pressure_scaling(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("Pressure scaling cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.pressure_scaling, "Pressure scaling")
     
     job.integrate_pressure_scaling()
     return job
@@ -415,11 +449,7 @@ def routine_alchemy(job):
     job.logger.info("Averaging routine finished in %f s"%te)
 
     #now run integration loops
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.run_integration(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("Alchemy integration cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.run_integration, "Alchemy integration")
 
     job.thermodynamic_integration()
     job.submit_report()
@@ -495,11 +525,7 @@ def routine_composition_scaling(job):
     job.logger.info("Averaging routine finished in %f s"%te)
 
     #now run integration loops
-    for i in range(job.calc.n_iterations):
-        ts = time.time()
-        job.run_integration(iteration=(i+1))
-        te = (time.time() - ts)
-        job.logger.info("Alchemy integration cycle %d finished in %f s"%(i+1, te))
+    run_iterations(job, job.run_integration, "Alchemy integration")
 
     flambda_arr, w_arr, q_arr, qerr_arr = job.thermodynamic_integration()
 
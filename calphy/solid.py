@@ -105,10 +105,13 @@ class Solid(cph.Phase):
         
         #now we can check if it converted
         file = os.path.join(self.simfolder, "msd.dat")
+        #only the last ncount-1 rows are used, read only those
+        nrows = ncount-1 if ncount > 1 else None
+        msd = ph.read_columns(file, usecols=range(1, self.calc.n_elements+1), nrows=nrows)
         k_mean = []
         k_std = []
         for i in range(self.calc.n_elements):
-            quant = np.loadtxt(file, usecols=(i+1, ), unpack=True)[-ncount+1:]
+            quant = msd[i]
             mean_quant = np.round(np.mean(quant), decimals=2)
             std_quant = np.round(np.std(quant), decimals=2)
             if mean_quant == 0:
@@ -160,6 +163,7 @@ class Solid(cph.Phase):
 
         lmp.command("unfix         3")
 
+    @cph.close_lammps_on_error
     def run_averaging(self):
         """
         Run averaging routine
@@ -210,10 +214,7 @@ class Solid(cph.Phase):
         At the end of the run, the averaged box dimensions are calculated. 
         """
 
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, 
-            init_commands=self.calc.md.init_commands,
-            script_mode=self.calc.script_mode)
+        lmp = self.create_lammps_object(script_mode=self.calc.script_mode)
 
         #set up potential
         if self.calc.potential_file is None:
@@ -229,11 +230,7 @@ class Solid(cph.Phase):
         lmp = ph.set_mass(lmp, self.calc)
 
         #add some computes
-        lmp.command("variable         mvol equal vol")
-        lmp.command("variable         mlx equal lx")
-        lmp.command("variable         mly equal ly")
-        lmp.command("variable         mlz equal lz")
-        lmp.command("variable         mpress equal press")
+        self.define_averaging_variables(lmp)
 
         #Run if a constrained lattice is not needed
         if not self.calc._fix_lattice:
@@ -263,8 +260,6 @@ class Solid(cph.Phase):
         self.dump_current_snapshot(lmp, "traj.equilibration_stage2.dat")
         self.check_if_melted(lmp, "traj.equilibration_stage2.dat")
         lmp = ph.write_data(lmp, "conf.equilibration.data")
-        #close object and process traj
-        lmp.close()
 
 
     def run_minimal_averaging(self):
@@ -289,10 +284,7 @@ class Solid(cph.Phase):
         is calculated.
         At the end of the run, the averaged box dimensions are calculated. 
         """
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, 
-            init_commands=self.calc.md.init_commands,
-            script_mode=self.calc.script_mode)
+        lmp = self.create_lammps_object(script_mode=self.calc.script_mode)
 
         #set up potential
         if self.calc.potential_file is None:
@@ -309,11 +301,7 @@ class Solid(cph.Phase):
 
 
         #add some computes
-        lmp.command("variable         mvol equal vol")
-        lmp.command("variable         mlx equal lx")
-        lmp.command("variable         mly equal ly")
-        lmp.command("variable         mlz equal lz")
-        lmp.command("variable         mpress equal press")
+        self.define_averaging_variables(lmp)
 
         #Run if a constrained lattice is not needed
         if not self.calc._fix_lattice:
@@ -352,6 +340,7 @@ class Solid(cph.Phase):
         self.assign_spring_constants(k_m)
         self.finalise_pressure()
 
+    @cph.close_lammps_on_error
     def run_integration(self, iteration=1):
         """
         Run integration routine
@@ -370,10 +359,7 @@ class Solid(cph.Phase):
         Run the integration routine where the initial and final systems are connected using
         the lambda parameter. See algorithm 4 in publication.
         """
-        lmp = ph.create_object(self.cores, self.simfolder, self.calc.md.timestep, 
-            self.calc.md.cmdargs, 
-            init_commands=self.calc.md.init_commands,
-            script_mode=self.calc.script_mode)
+        lmp = self.create_lammps_object(script_mode=self.calc.script_mode)
 
         #set up potential
         if self.calc.potential_file is None:
@@ -393,108 +379,99 @@ class Solid(cph.Phase):
         #remap the box to get the correct pressure
         lmp = ph.remap_box(lmp, self.lx, self.ly, self.lz)
 
+        #collect the switching commands and send them to LAMMPS at once
+        cmds = []
         #create groups - each species belong to one group
         for i in range(self.calc.n_elements):
-            lmp.command("group  g%d type %d"%(i+1, i+1))
+            cmds.append("group  g%d type %d"%(i+1, i+1))
 
         #get counts of each group
         for i in range(self.calc.n_elements):
-            lmp.command("variable   count%d equal count(g%d)"%(i+1, i+1))
+            cmds.append("variable   count%d equal count(g%d)"%(i+1, i+1))
 
         #initialise everything
-        lmp.command("run               0")
+        cmds.append("run               0")
 
         #apply initial fixes
-        lmp.command("fix               f1 all nve")
+        cmds.append("fix               f1 all nve")
         
         #apply fix for each spring
         #TODO: Add option to select function
         for i in range(self.calc.n_elements):
-            lmp.command("fix               ff%d g%d ti/spring 10.0 100 100 function 2"%(i+1, i+1))
+            cmds.append("fix               ff%d g%d ti/spring 10.0 100 100 function 2"%(i+1, i+1))
         
         #apply temp fix
-        lmp.command("fix               f3 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
-                                        np.random.randint(1, 10000)))
+        cmds.append("fix               f3 all langevin %f %f %f %d zero yes"%(self.calc._temperature, self.calc._temperature, self.calc.md.thermostat_damping[1], 
+                                        self.get_seed()))
 
         #compute com and apply to fix
-        lmp.command("compute           Tcm all temp/com")
-        lmp.command("fix_modify        f3 temp Tcm")
+        cmds.append("compute           Tcm all temp/com")
+        cmds.append("fix_modify        f3 temp Tcm")
 
-        lmp.command("variable          step    equal step")
-        lmp.command("variable          dU1      equal pe/atoms")
+        cmds.append("variable          step    equal step")
+        cmds.append("variable          dU1      equal pe/atoms")
         for i in range(self.calc.n_elements):
-            lmp.command("variable          dU%d      equal f_ff%d"%(i+2, i+1))
+            cmds.append("variable          dU%d      equal f_ff%d"%(i+2, i+1))
         
-        lmp.command("variable          lambda  equal f_ff1[1]")
+        cmds.append("variable          lambda  equal f_ff1[1]")
 
         #add thermo command to force variable evaluation
-        lmp.command("thermo_style      custom step pe c_Tcm")
-        lmp.command("thermo            10000")
+        cmds.append("thermo_style      custom step pe c_Tcm")
+        cmds.append("thermo            10000")
 
         #Create velocity
-        lmp.command("velocity          all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, np.random.randint(1, 10000)))
+        cmds.append("velocity          all create %f %d mom yes rot yes dist gaussian"%(self.calc._temperature, self.get_seed()))
 
         #reapply 
         for i in range(self.calc.n_elements):
-            lmp.command("fix               ff%d g%d ti/spring %f %d %d function 2"%(i+1, i+1, self.k[i], 
+            cmds.append("fix               ff%d g%d ti/spring %f %d %d function 2"%(i+1, i+1, self.k[i], 
                 self.calc._n_switching_steps, self.calc.n_equilibration_steps))
 
         #Equilibriate structure
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
         
-        #write out energy
-        str1 = "fix f4 all print 1 \"${dU1} "
+        #write out energy, the printed quantities are the same for both directions
+        str1 = "fix f4 all print %d \"${dU1} "%self.calc._n_switching_print_steps
         str2 = []
         for i in range(self.calc.n_elements):
             str2.append("${dU%d}"%(i+2))
 
         str2.append("${lambda}\"")
         str2 = " ".join(str2)
-        str3 = " screen no file forward_%d.dat"%iteration
-        command = str1 + str2 + str3
-        lmp.command(command)
+        print_command = str1 + str2
+        cmds.append(print_command + " screen no file forward_%d.dat"%iteration)
 
         if self.calc.n_print_steps > 0:
-            lmp.command("dump              d1 all custom %d traj.fe.forward_%d.dat id type mass x y z fx fy fz"%(self.calc.n_print_steps,
+            cmds.append("dump              d1 all custom %d traj.fe.forward_%d.dat id type mass x y z fx fy fz"%(self.calc.n_print_steps,
                 iteration))
 
         #Forward switching over ts steps
-        lmp.command("run               %d"%self.calc._n_switching_steps)
-        lmp.command("unfix             f4")
+        cmds.append("run               %d"%self.calc._n_switching_steps)
+        cmds.append("unfix             f4")
 
         if self.calc.n_print_steps > 0:
-            lmp.command("undump           d1")
+            cmds.append("undump           d1")
 
         #Equilibriate
-        lmp.command("run               %d"%self.calc.n_equilibration_steps)
+        cmds.append("run               %d"%self.calc.n_equilibration_steps)
 
         #write out energy
-        str1 = "fix f4 all print 1 \"${dU1} "
-        str2 = []
-        for i in range(self.calc.n_elements):
-            str2.append("${dU%d}"%(i+2))
-
-        str2.append("${lambda}\"")
-        str2 = " ".join(str2)
-        str3 = " screen no file backward_%d.dat"%iteration
-        command = str1 + str2 + str3
-        lmp.command(command)
+        cmds.append(print_command + " screen no file backward_%d.dat"%iteration)
 
         if self.calc.n_print_steps > 0:
-            lmp.command("dump              d1 all custom %d traj.fe.backward_%d.dat id type mass x y z fx fy fz"%(self.calc.n_print_steps,
+            cmds.append("dump              d1 all custom %d traj.fe.backward_%d.dat id type mass x y z fx fy fz"%(self.calc.n_print_steps,
                 iteration))
 
         #Reverse switching over ts steps
-        lmp.command("run               %d"%self.calc._n_switching_steps)
-        lmp.command("unfix             f4")
+        cmds.append("run               %d"%self.calc._n_switching_steps)
+        cmds.append("unfix             f4")
 
         if self.calc.n_print_steps > 0:
-            lmp.command("undump           d1")
+            cmds.append("undump           d1")
+        lmp.command(cmds)
 
-        #close object
-        if not self.calc.script_mode:
-            lmp.close()
-        else:
+        #serialise script
+        if self.calc.script_mode:
             file = os.path.join(self.simfolder, 'integration.lmp')
             lmp.write(file)
 
@@ -38,3 +38,17 @@ def test_validate_spring_constants():
 	d = [1, np.NaN, 4]
 	e = ch.validate_spring_constants(d)
 	assert e[1] == 1
+
+def test_read_columns(tmp_path):
+	file = tmp_path / "forward_1.dat"
+	with open(file, "w") as fout:
+		fout.write("# Fix print output for fix f4\n")
+		for i in range(10):
+			fout.write(f"{i} {0.5*i} {0.1*i}\n")
+	data = ch.read_columns(file)
+	assert data.shape == (3, 10)
+	assert np.allclose(data[2], 0.1*np.arange(10))
+	data = ch.read_columns(file, usecols=[1, 2])
+	assert np.allclose(data[0], 0.5*np.arange(10))
+	data = ch.read_columns(file, usecols=(0,), nrows=3)
+	assert np.array_equal(data[0], [7, 8, 9])
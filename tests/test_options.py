@@ -1,6 +1,36 @@
 import pytest
-from calphy.input import read_inputfile
+import numpy as np
+from calphy.input import read_inputfile, _read_lammps_data_types, _read_lammps_data_header, _count_species
 
 def test_options():
 	options = read_inputfile("tests/input.yaml")
-	assert options[0]._temperature == 1300
\ No newline at end of file
+	assert options[0]._temperature == 1300
+
+def test_read_lammps_data_types():
+	natoms, types = _read_lammps_data_types("tests/conf1.data")
+	assert natoms == 500
+	assert len(types) == 500
+	assert np.all(types == 1)
+
+def test_read_lammps_data_header():
+	natoms, skiprows, style = _read_lammps_data_header("tests/conf1.data")
+	assert natoms == 500
+	assert style is None
+	with pytest.raises(ValueError):
+		_read_lammps_data_header("tests/input.yaml")
+
+def test_count_species():
+	counts = _count_species(np.array([29, 29, 40]), [40, 29])
+	assert np.array_equal(counts, [1, 2])
+	with pytest.raises(ValueError):
+		_count_species(np.array([29, 13, 40]), [40, 29])
+
+def test_read_lammps_data_types_style(tmp_path):
+	file = tmp_path / "full.data"
+	with open(file, "w") as fout:
+		fout.write("LAMMPS data file\n\n2 atoms\n1 atom types\n\nAtoms # full\n\n")
+		fout.write("1 1 1 0.0 0.0 0.0 0.0\n2 1 1 0.0 1.0 1.0 1.0\n")
+	natoms, skiprows, style = _read_lammps_data_header(file)
+	assert style == "full"
+	with pytest.raises(ValueError):
+		_read_lammps_data_types(file)
\ No newline at end of file